@@ -0,0 +1,175 @@
+import io
+import os
+import sys
+import math
+import json
+import time
+import wave
+import struct
+import threading
+from queue import Queue
+
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+try:
+    import winreg
+except ImportError:
+    winreg = None
+
+ALARM_SOUND = "alarm"
+
+
+def make_tone(freq=880, duration=0.12, beeps=2, gap=0.08, volume=0.4, rate=22050):
+    """A short beep pattern rendered once into WAV bytes."""
+    frames = bytearray()
+    fade = int(rate * 0.005)
+    n = int(rate * duration)
+    for b in range(beeps):
+        for i in range(n):
+            env = min(1.0, i / fade, (n - i) / fade)
+            frames += struct.pack("<h", int(32767 * volume * env * math.sin(2 * math.pi * freq * i / rate)))
+        if b < beeps - 1:
+            frames += b"\0\0" * int(rate * gap)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(bytes(frames))
+    return buf.getvalue()
+
+
+def system_sound(alias="SystemNotification"):
+    """WAV bytes of a Windows sound alias, or None if it can't be resolved."""
+    if winreg is None:
+        return None
+    try:
+        key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, rf"AppEvents\Schemes\Apps\.Default\{alias}\.Current")
+        path = os.path.expandvars(winreg.QueryValue(key, None))
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class AudioBackend:
+    """Plays preloaded sounds on a worker thread.
+
+    Sounds are loaded once as in-memory WAV buffers; play() only queues a
+    name and returns. Overlapping requests are queued, and a sound that is
+    already waiting in the queue is not queued twice, so a repeat loop can't
+    build a backlog.
+    """
+    def __init__(self):
+        self.sounds = {}
+        self._queue = Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def load(self, name, data):
+        self.sounds[name] = data
+
+    def load_file(self, name, path):
+        with open(path, "rb") as f:
+            self.load(name, f.read())
+
+    def play(self, name):
+        if name not in self.sounds:
+            raise KeyError(f"sound not loaded: {name}")
+        with self._lock:
+            if name in self._pending:
+                return
+            self._pending.add(name)
+        self._queue.put(name)
+
+    def stop(self):
+        with self._lock:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+                self._queue.task_done()
+            self._pending.clear()
+        self._stop()
+
+    def wait_idle(self):
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            name = self._queue.get()
+            with self._lock:
+                self._pending.discard(name)
+            try:
+                self._play(name, self.sounds[name])
+            finally:
+                self._queue.task_done()
+
+    def _play(self, name, data):
+        pass
+
+    def _stop(self):
+        pass
+
+
+class WinsoundBackend(AudioBackend):
+    def _play(self, name, data):
+        winsound.PlaySound(data, winsound.SND_MEMORY)
+
+    def _stop(self):
+        winsound.PlaySound(None, 0)
+
+
+class BellBackend(AudioBackend):
+    def _play(self, name, data):
+        sys.stdout.write("\a")
+        sys.stdout.flush()
+
+
+class NullBackend(AudioBackend):
+    pass
+
+
+class RecordingBackend(AudioBackend):
+    """Plays nothing; records (name, monotonic, wall clock) for every sound started.
+
+    With log_path each record is also appended there as a JSON line, so a test
+    driving timer.py / event_timer.py as a subprocess can read them back.
+    """
+    def __init__(self, log_path=None):
+        super().__init__()
+        self.played = []
+        self.log_path = log_path
+
+    def _play(self, name, data):
+        record = (name, time.monotonic(), time.time())
+        self.played.append(record)
+        if self.log_path:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(dict(zip(("name", "monotonic", "time"), record))) + "\n")
+
+
+BACKENDS = {
+    "winsound": WinsoundBackend,
+    "bell": BellBackend,
+    "null": NullBackend,
+    "record": RecordingBackend,
+}
+
+
+def get_backend(name=None):
+    """Backend from name or the KG_AUDIO environment variable; winsound on Windows, else bell.
+
+    The record backend appends to the file named by KG_AUDIO_LOG, if set.
+    """
+    name = name or os.environ.get("KG_AUDIO") or ("winsound" if winsound else "bell")
+    if name not in BACKENDS:
+        raise ValueError(f"unknown audio backend {name!r}, choose from: {', '.join(BACKENDS)}")
+    if name == "record":
+        backend = RecordingBackend(os.environ.get("KG_AUDIO_LOG"))
+    else:
+        backend = BACKENDS[name]()
+    backend.load(ALARM_SOUND, system_sound() or make_tone())
+    return backend
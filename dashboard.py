@@ -0,0 +1,176 @@
+import os
+import sys
+import shutil
+import threading
+import time
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import tty
+    import atexit
+    import termios
+
+CSI = "\x1b["
+
+tty_saved = None
+
+
+def enable_ansi():
+    if os.name == "nt":
+        os.system("") # switches the Windows console to VT (ANSI) processing
+
+
+def getch():
+    """One key press as bytes; b'' once stdin is closed."""
+    if msvcrt:
+        return msvcrt.getch()
+    # POSIX: cbreak/no-echo so keys arrive one at a time without scrolling the
+    # dashboard; the terminal is restored at exit
+    global tty_saved
+    fd = sys.stdin.fileno()
+    if tty_saved is None and os.isatty(fd):
+        tty_saved = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+        atexit.register(termios.tcsetattr, fd, termios.TCSADRAIN, tty_saved)
+    key = os.read(fd, 1)
+    while key in (b'\r', b'\n'): # Enter from a pipe or cooked input is not a key press
+        key = os.read(fd, 1)
+    return key
+
+
+class Dashboard:
+    """A block of text lines at the bottom of the terminal, redrawn by diff.
+
+    set_lines() only updates the frame model. A render thread flushes it at
+    most fps times a second and writes just the changed part of each changed
+    line with relative cursor moves, in one write per frame, so output is
+    proportional to what changed rather than to the size of the frame.
+    """
+    def __init__(self, fps=10, stream=None):
+        self.stream = stream or sys.stdout
+        self.interval = 1.0 / fps
+        self.ansi = self.stream.isatty()
+        self._lines = []
+        self._shown = [] # what is on screen
+        self._row = 0 # cursor row inside the block
+        self._col = 0
+        self._lock = threading.RLock()
+        self._dirty = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        if self.ansi:
+            enable_ansi()
+            self.stream.write(CSI + "?25l")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def set_lines(self, lines):
+        with self._lock:
+            self._lines = list(lines)
+        self._dirty.set()
+
+    def set_line(self, index, text):
+        with self._lock:
+            self._lines.extend([""] * (index + 1 - len(self._lines)))
+            self._lines[index] = text
+        self._dirty.set()
+
+    def log(self, text):
+        """Print text above the block; the block is redrawn below it."""
+        with self._lock:
+            out = []
+            if self.ansi and self._shown:
+                out.append(self._move(0, 0) + CSI + "J")
+            out.append(text + "\n")
+            self.stream.write("".join(out))
+            self._shown = []
+            self._row = self._col = 0
+            self.stream.flush()
+        self._dirty.set()
+
+    def close(self):
+        self._stopped = True
+        self._dirty.set()
+        if self._thread:
+            self._thread.join()
+        with self._lock:
+            self._flush()
+            if self.ansi:
+                if self._shown:
+                    self.stream.write(self._move(len(self._shown) - 1, 0) + "\n")
+                self.stream.write(CSI + "?25h")
+            self.stream.flush()
+
+    def _run(self):
+        while not self._stopped:
+            self._dirty.wait()
+            if self._stopped:
+                return
+            self._dirty.clear()
+            with self._lock:
+                self._flush()
+            time.sleep(self.interval) # coalesce everything set meanwhile into the next frame
+
+    def _move(self, row, col):
+        out = ""
+        if row < self._row:
+            out += f"{CSI}{self._row - row}A"
+        elif row > self._row:
+            out += f"{CSI}{row - self._row}B"
+        if col != self._col:
+            out += "\r" + (f"{CSI}{col}C" if col else "")
+        self._row, self._col = row, col
+        return out
+
+    def _flush(self):
+        if not self.ansi:
+            changed = [l for i, l in enumerate(self._lines) if i >= len(self._shown) or self._shown[i] != l]
+            if changed:
+                self.stream.write("\n".join(changed) + "\n")
+                self.stream.flush()
+            self._shown = list(self._lines)
+            return
+
+        if not self._lines and not self._shown:
+            return
+        width = max(shutil.get_terminal_size().columns - 1, 1)
+        lines = [l[:width] for l in self._lines]
+        lines += [""] * (len(self._shown) - len(lines)) # a shrinking block is blanked, not scrolled
+        out = []
+        if not self._shown:
+            # new block: open its rows below the current line
+            self._shown = [""]
+            self._row = self._col = 0
+            out.append("\r")
+        for i, new in enumerate(lines):
+            if i >= len(self._shown):
+                out.append(self._move(len(self._shown) - 1, 0) + "\n")
+                self._shown.append("")
+                self._row += 1
+            old = self._shown[i]
+            if new == old:
+                continue
+            a = 0
+            n = min(len(new), len(old))
+            while a < n and new[a] == old[a]:
+                a += 1
+            if len(new) == len(old):
+                b = len(new)
+                while b > a and new[b - 1] == old[b - 1]:
+                    b -= 1
+                text = new[a:b]
+            else:
+                text = new[a:]
+            out.append(self._move(i, a) + text)
+            self._col += len(text)
+            if len(new) < len(old):
+                out.append(CSI + "K")
+            self._shown[i] = new
+        if out:
+            self.stream.write("".join(out))
+            self.stream.flush()
@@ -1,10 +1,17 @@
 import time
 import threading
-import winsound
 from datetime import datetime, timedelta, timezone
-import msvcrt
 from queue import Queue
+from itertools import islice
+from bisect import bisect_left
+import argparse
+import json
+import math
 import re
+import sys
+import zlib
+from dashboard import Dashboard, getch
+from audio import get_backend, ALARM_SOUND
 
 ALARM_TEXT = """
 UTC Mo 16:00 # comment
@@ -20,6 +27,11 @@ UTC Sa 17:00
 
 ADVANCE_SECONDS_LIST = [60*5, 0]
 
+CLOCK_CHECK_SECONDS = 1.0 # longest single wait, bounds how late a suspend/resume is noticed
+CLOCK_JUMP_SECONDS = 2.0 # wall vs monotonic drift treated as a clock jump
+LATE_SECONDS = 1.0
+LATENCY_BINS_MS = [1, 5, 10, 50, 100, 500, 1000, 10000]
+
 LOCAL_TZ = datetime.now().astimezone().tzinfo
 
 stop_all = False
@@ -27,10 +39,19 @@ key_queue = Queue()
 key_event = threading.Event()
 alarm_list = []
 alarm_active = threading.Event()
+fired_occurrences = set()
+fire_log = []
+latency_log_path = None
+dashboard = Dashboard()
+audio = None
+schedule_lines = []
 
 weekday_map = {"Su":6,"Mo":0,"Tu":1,"We":2,"Th":3,"Fr":4,"Sa":5}
 weekday_names = ["Su","Mo","Tu","We","Th","Fr","Sa"]
 
+WEEK_SECONDS = 7*24*3600
+WEEK_EPOCH = datetime(1970, 1, 5, tzinfo=timezone.utc) # a Monday
+
 def parse_alarm_line(line):
     line = line.rstrip("\n")
     if not line:
@@ -86,8 +107,7 @@ def parse_alarm_line(line):
         "tz_str": tz_str,
         "raw": stripped,
         "original_line": line.strip(),
-        "comment": comment,
-        "advance_triggered": [False]*len(ADVANCE_SECONDS_LIST)
+        "comment": comment
     }
 
 def load_alarms(text):
@@ -138,6 +158,108 @@ def build_alarm_schedule():
             schedule.append((alarm, orig_dt, local_dt))
     return schedule
 
+# ------------------- Occurrence queries -------------------
+# Every alarm tz is a fixed offset, so the whole alarm set repeats exactly once
+# a week. The week is expanded once into sorted offsets from WEEK_EPOCH and
+# range queries just walk that list, week after week.
+_week_cache = {"key": None, "offsets": [], "alarms": []}
+
+def week_expansion(alarms=None):
+    if alarms is None:
+        alarms = alarm_list
+    key = tuple((id(a), a["hour"], a["minute"], a["second"], a["weekday"], a["tz"]) for a in alarms)
+    if _week_cache["key"] != key:
+        entries = []
+        for alarm in alarms:
+            days = range(7) if alarm["weekday"] is None else [alarm["weekday"]]
+            utc_offset = alarm["tz"].utcoffset(None).total_seconds()
+            for day in days:
+                sec = day*86400 + alarm["hour"]*3600 + alarm["minute"]*60 + alarm["second"]
+                entries.append((int(sec - utc_offset) % WEEK_SECONDS, alarm))
+        entries.sort(key=lambda e: e[0])
+        _week_cache["key"] = key
+        _week_cache["offsets"] = [e[0] for e in entries]
+        _week_cache["alarms"] = [e[1] for e in entries]
+    return _week_cache["offsets"], _week_cache["alarms"]
+
+def _as_aware(dt):
+    return dt.replace(tzinfo=LOCAL_TZ) if dt.tzinfo is None else dt
+
+def iter_occurrences(start=None, alarms=None):
+    """Yield (alarm, orig_dt, local_dt) for every occurrence at or after start, in order."""
+    offsets, entries = week_expansion(alarms)
+    if not offsets:
+        return
+    start = datetime.now(LOCAL_TZ) if start is None else _as_aware(start)
+    week, rem = divmod((start - WEEK_EPOCH) // timedelta(microseconds=1), WEEK_SECONDS * 10**6)
+    i = bisect_left(offsets, rem / 10**6)
+    while True:
+        if i == len(offsets):
+            i = 0
+            week += 1
+        alarm = entries[i]
+        utc_dt = WEEK_EPOCH + timedelta(seconds=week*WEEK_SECONDS + offsets[i])
+        yield alarm, utc_dt.astimezone(alarm["tz"]), utc_dt.astimezone(LOCAL_TZ)
+        i += 1
+
+def occurrences_between(start, end, alarms=None):
+    """All occurrences in [start, end)."""
+    end = _as_aware(end)
+    result = []
+    for occ in iter_occurrences(start, alarms):
+        if occ[2] >= end:
+            break
+        result.append(occ)
+    return result
+
+def next_occurrences(k, start=None, alarms=None):
+    return list(islice(iter_occurrences(start, alarms), k))
+
+def _ical_dt(dt):
+    return dt.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def _ical_text(text):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+
+def _ical_fold(line):
+    """RFC 5545 folding: at most 75 octets per line, continuations start with a space."""
+    data = line.encode("utf-8")
+    parts = []
+    limit = 75
+    while len(data) > limit:
+        cut = limit
+        while data[cut] & 0xC0 == 0x80: # don't split a UTF-8 sequence
+            cut -= 1
+        parts.append(data[:cut])
+        data = data[cut:]
+        limit = 74 # the leading space counts
+    parts.append(data)
+    return "\r\n ".join(p.decode("utf-8") for p in parts)
+
+def occurrences_to_ical(occurrences):
+    stamp = _ical_dt(datetime.now(timezone.utc))
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//kg_calc//event_timer//EN"]
+    for alarm, orig_dt, local_dt in occurrences:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{_ical_dt(orig_dt)}-{zlib.crc32(alarm['original_line'].encode()):08x}@event_timer",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_ical_dt(orig_dt)}",
+            f"SUMMARY:{_ical_text(alarm['comment'] or alarm['raw'])}",
+            f"DESCRIPTION:{_ical_text(alarm['original_line'])}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_ical_fold(l) for l in lines) + "\r\n"
+
+def occurrences_to_json(occurrences):
+    return json.dumps([{
+        "start": local_dt.isoformat(),
+        "start_utc": orig_dt.astimezone(timezone.utc).isoformat(),
+        "alarm": alarm["original_line"],
+        "comment": alarm["comment"],
+    } for alarm, orig_dt, local_dt in occurrences], indent=2) + "\n"
+
 def tz_offset_str(tz):
     try:
         offset = tz.utcoffset(None)
@@ -162,7 +284,7 @@ def print_alarm_schedule():
         key=lambda tpl: (tpl[1].astimezone(timezone.utc).weekday(), tpl[1].time(), tpl[1])
     )
 
-    print("\n--- Alarm List ---")
+    lines = ["--- Alarm List ---"]
     for alarm, orig_dt, local_dt in schedule_sorted:
         is_next = (next_entry is not None and local_dt == next_entry[2])
         marker = " <-- NEXT" if is_next else ""
@@ -172,98 +294,190 @@ def print_alarm_schedule():
         local_str = f"{local_dt.strftime('%a %H:%M:%S')} [local]"
         # comment_str = f"[{alarm['comment']}]" if alarm.get('comment') else ""
 
-        print(f"{orig_str}  =>  {local_str}  [{alarm['original_line']}] {marker}")
+        lines.append(f"{orig_str}  =>  {local_str}  [{alarm['original_line']}] {marker}")
 
-    print("-----------------")
+    lines.append("-----------------")
+    schedule_lines[:] = lines
+    dashboard.set_lines(schedule_lines + [last_display])
 
 last_display = ""
 def display(text=''):
     global last_display
-    if text != last_display:
-        print(text + " " * max(0, len(last_display)-len(text)), end='\r', flush=True)
-        last_display = text
+    last_display = text
+    dashboard.set_lines(schedule_lines + [text])
 
 def alarm_sound_thread():
     while not stop_all:
         alarm_active.wait()
         while alarm_active.is_set() and not stop_all:
-            winsound.PlaySound("SystemNotification", winsound.SND_ALIAS)
+            audio.play(ALARM_SOUND)
             for _ in range(8):
                 if stop_all or not alarm_active.is_set():
                     break
                 time.sleep(0.1)
+        audio.stop()
 
 def keyboard_thread():
     while not stop_all:
-        k = msvcrt.getch()
+        k = getch()
+        if not k:
+            return
         key_queue.put(k)
         key_event.set()
 
-def check_missed_alarms_on_start():
-    now_local = datetime.now(LOCAL_TZ)
-    max_adv = max(ADVANCE_SECONDS_LIST) if ADVANCE_SECONDS_LIST else 0
-    schedule = build_alarm_schedule()
-
-    for alarm, orig_dt, local_dt in schedule:
-        if local_dt > now_local and (local_dt - timedelta(seconds=max_adv)) <= now_local:
-            comment_str = f"[{alarm['comment']}]" if alarm.get('comment') else ""
-            display(f"ALARM! (missed) {local_dt.strftime('%Y-%m-%d %H:%M:%S')} [{alarm['original_line']}] {comment_str}")
-            alarm_active.set()
-            time.sleep(1.2)
+def occurrence_key(alarm, orig_dt, adv_idx):
+    return (id(alarm), orig_dt, adv_idx)
+
+def mark_fired(alarm, orig_dt, local_dt, now_local):
+    # everything of this occurrence that is already due counts as fired,
+    # so a late (or missed) occurrence alarms once instead of once per advance
+    for idx, adv in enumerate(ADVANCE_SECONDS_LIST):
+        if local_dt - timedelta(seconds=adv) <= now_local:
+            fired_occurrences.add(occurrence_key(alarm, orig_dt, idx))
+
+def prune_fired(cursor):
+    # occurrences this old can't produce a fire time at or after the cursor
+    oldest = cursor - timedelta(seconds=max(ADVANCE_SECONDS_LIST, default=0))
+    stale = [k for k in fired_occurrences if k[1] < oldest]
+    fired_occurrences.difference_update(stale)
+
+def record_fire(alarm, scheduled, actual):
+    entry = {
+        "alarm": alarm["original_line"],
+        "scheduled": scheduled.isoformat(),
+        "actual": actual.isoformat(),
+        "latency_ms": (actual - scheduled).total_seconds() * 1000,
+    }
+    fire_log.append(entry)
+    if latency_log_path:
+        with open(latency_log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    return entry
+
+def load_latency_log(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def latency_histogram(entries=None, bins=LATENCY_BINS_MS):
+    """Count fires per latency bucket: [(upper_ms or None, count), ...]."""
+    if entries is None:
+        entries = fire_log
+    counts = [0]*(len(bins)+1)
+    for e in entries:
+        counts[bisect_left(bins, abs(e["latency_ms"]))] += 1
+    return list(zip(list(bins) + [None], counts))
+
+def latency_report(entries=None):
+    if entries is None:
+        entries = fire_log
+    if not entries:
+        return "no alarms fired"
+    latencies = sorted(abs(e["latency_ms"]) for e in entries)
+    n = len(latencies)
+    within = sum(1 for v in latencies if v < 100)
+    lines = [f"fires {n}  p50 {latencies[n//2]:.1f}ms  p99 {latencies[min(n-1, n*99//100)]:.1f}ms"
+             f"  max {latencies[-1]:.1f}ms  <100ms {within*100/n:.1f}%"]
+    lower = 0
+    for upper, count in latency_histogram(entries):
+        label = f"{lower:g}-{upper:g}ms" if upper is not None else f">={lower:g}ms"
+        lines.append(f"  {label:>14} {count:6d} {'#'*round(count*40/n)}")
+        lower = upper
+    return "\n".join(lines)
+
+def register_fire(next_fire, now_local):
+    """Record a fire that happened at now_local and mark what it covers as fired."""
+    fire_time_local, alarm_obj, orig_dt, local_dt, adv_idx, adv_sec = next_fire
+    entry = record_fire(alarm_obj, fire_time_local, now_local)
+    # the wall clock can read a few ms before the monotonic deadline;
+    # the alarm that fired must never be found again from this cursor
+    fired_occurrences.add(occurrence_key(alarm_obj, orig_dt, adv_idx))
+    mark_fired(alarm_obj, orig_dt, local_dt, max(now_local, fire_time_local))
+    prune_fired(fire_time_local)
+    return entry
+
+def find_next_fire(cursor):
+    """Earliest unfired (fire_local, alarm, orig_dt, local_dt, adv_idx, adv_sec) at or after cursor."""
+    if not ADVANCE_SECONDS_LIST:
+        return None
+    max_adv = timedelta(seconds=max(ADVANCE_SECONDS_LIST))
+    best = None
+    for alarm, orig_dt, local_dt in iter_occurrences(cursor):
+        if best is not None and local_dt - max_adv > best[0]:
+            break
+        for idx, adv in enumerate(ADVANCE_SECONDS_LIST):
+            fire_local = local_dt - timedelta(seconds=adv)
+            if fire_local < cursor or occurrence_key(alarm, orig_dt, idx) in fired_occurrences:
+                continue
+            if best is None or fire_local < best[0]:
+                best = (fire_local, alarm, orig_dt, local_dt, idx, adv)
+    return best
+
+def handle_wait_keys():
+    global stop_all
+    while not key_queue.empty():
+        kk = key_queue.get().lower()
+        if kk in (b'\x03', b'q'):
+            stop_all = True
             alarm_active.clear()
-            alarm['advance_triggered'] = [True]*len(ADVANCE_SECONDS_LIST)
+            return False
+        if kk == b'h':
+            dashboard.log(latency_report())
+    return True
+
+def wait_until(fire_time_local):
+    """Sleep until a wall-clock deadline. Returns False if the user quit.
+
+    The deadline is tracked on time.monotonic(); every CLOCK_CHECK_SECONDS the
+    wall/monotonic offset is compared, and a jump (suspend/resume, clock change)
+    resyncs the deadline to the wall clock.
+    """
+    fire_ts = fire_time_local.timestamp()
+    wall_offset = time.time() - time.monotonic()
+    deadline = fire_ts - wall_offset
+    while True:
+        offset = time.time() - time.monotonic()
+        if abs(offset - wall_offset) > CLOCK_JUMP_SECONDS:
+            dashboard.log(f"clock jumped {offset - wall_offset:+.1f}s (suspend/resume or clock change)")
+            wall_offset = offset
+            deadline = fire_ts - wall_offset
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return True
+        display(f"next {fire_time_local.strftime('%a %H:%M:%S')} in {timedelta(seconds=math.ceil(remaining))}")
+        key_event.wait(timeout=min(remaining, CLOCK_CHECK_SECONDS))
+        key_event.clear()
+        if not handle_wait_keys():
+            return False
 
 def alarm_loop():
     global stop_all
+    # start one advance window back: an advance that came due before startup
+    # fires once, late, and goes into the latency data like any other fire
+    max_adv = max(ADVANCE_SECONDS_LIST, default=0)
+    cursor = datetime.now(LOCAL_TZ) - timedelta(seconds=max_adv)
     while not stop_all:
-        now_local = datetime.now(LOCAL_TZ)
-        schedule = build_alarm_schedule()
-
-        if not schedule:
-            time.sleep(1)
-            continue
-
-        next_fire = None
-
-        for alarm, orig_dt, local_dt in schedule:
-            for idx, adv in enumerate(ADVANCE_SECONDS_LIST):
-                if alarm['advance_triggered'][idx]:
-                    continue
-
-                fire_local = local_dt - timedelta(seconds=adv)
-                if fire_local < now_local:
-                    continue
-
-                if next_fire is None or fire_local < next_fire[0]:
-                    next_fire = (fire_local, alarm, orig_dt, idx, adv)
+        next_fire = find_next_fire(cursor)
 
         if next_fire is None:
             time.sleep(1)
             continue
 
-        fire_time_local, alarm_obj, orig_dt, adv_idx, adv_sec = next_fire
+        fire_time_local, alarm_obj, orig_dt, local_dt, adv_idx, adv_sec = next_fire
 
         print_alarm_schedule()
 
-        while True:
-            now_local = datetime.now(LOCAL_TZ)
-            delta = (fire_time_local - now_local).total_seconds()
-            if delta <= 0:
-                break
-            key_event.wait(timeout=min(delta, 60))
-            key_event.clear()
+        if not wait_until(fire_time_local):
+            return
 
-            while not key_queue.empty():
-                kk = key_queue.get().lower()
-                if kk in (b'\x03', b'q'):
-                    stop_all = True
-                    alarm_active.clear()
-                    return
+        now_local = datetime.now(LOCAL_TZ)
+        alarm_active.set()
+        entry = register_fire(next_fire, now_local)
+        cursor = fire_time_local
 
+        late = entry["latency_ms"] / 1000
+        late_str = f" late by {late:.0f}s" if late >= LATE_SECONDS else ""
         comment_str = f"[{alarm_obj['comment']}]" if alarm_obj.get('comment') else ""
-        display(f"ALARM! {fire_time_local.strftime('%Y-%m-%d %H:%M:%S')} [{alarm_obj['original_line']}] {comment_str} (advance {adv_sec}s)")
-        alarm_active.set()
-        alarm_obj['advance_triggered'][adv_idx] = True
+        display(f"ALARM! {fire_time_local.strftime('%Y-%m-%d %H:%M:%S')} [{alarm_obj['original_line']}] {comment_str} (advance {adv_sec}s){late_str}")
 
         stopped = False
         while not stop_all and not stopped:
@@ -281,22 +495,68 @@ def alarm_loop():
                     stopped = True
             time.sleep(0.05)
 
+def export_schedule(args, start):
+    if args.count is not None:
+        occurrences = next_occurrences(args.count, start)
+    else:
+        occurrences = occurrences_between(start, _as_aware(start) + timedelta(days=args.days))
+    text = occurrences_to_ical(occurrences) if args.export == "ics" else occurrences_to_json(occurrences)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
 def main():
-    global alarm_list
+    global alarm_list, latency_log_path, audio
+    parser = argparse.ArgumentParser(description="Weekly event alarm")
+    parser.add_argument("--export", choices=["ics", "json"], help="write the schedule and exit")
+    parser.add_argument("--start", help="ISO datetime to start from (default: now)")
+    parser.add_argument("--days", type=float, default=7, help="export range length in days")
+    parser.add_argument("--count", type=int, help="export the next COUNT occurrences instead of a range")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--latency-log", help="append per-fire latency records (JSON lines) to this file")
+    parser.add_argument("--latency-report", metavar="LOG", help="print the latency histogram of a log file and exit")
+    args = parser.parse_args()
+
+    if args.latency_report:
+        print(latency_report(load_latency_log(args.latency_report)))
+        return
+    latency_log_path = args.latency_log
+
     alarm_list = load_alarms(ALARM_TEXT)
 
-    print("Press Ctrl+C or Q to quit, any other key stops alarm")
+    if args.export:
+        if args.count is not None and args.count < 0:
+            parser.error("--count must not be negative")
+        if args.days < 0:
+            parser.error("--days must not be negative")
+        try:
+            start = datetime.fromisoformat(args.start) if args.start else datetime.now(LOCAL_TZ)
+        except ValueError:
+            parser.error(f"--start is not an ISO datetime: {args.start}")
+        export_schedule(args, start)
+        return
+
+    print("Press Ctrl+C or Q to quit, H for latency report, any other key stops alarm")
 
+    try:
+        audio = audio or get_backend() # tests may assign a backend before main()
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    dashboard.start()
     threading.Thread(target=alarm_sound_thread, daemon=True).start()
     threading.Thread(target=keyboard_thread, daemon=True).start()
 
-    check_missed_alarms_on_start()
-
     try:
         alarm_loop()
     except KeyboardInterrupt:
         pass
 
+    dashboard.close()
+    if fire_log:
+        print("\n" + latency_report())
     print("\nBye.")
 
 if __name__ == "__main__":
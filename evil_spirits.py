@@ -0,0 +1,123 @@
+import sys
+import csv
+import math
+import json
+import argparse
+
+WAVES = 20
+ELITE_WAVES = (7, 14, 17)
+BOSS_WAVES = (10, 20)
+
+
+def wave_kind(wave):
+    if wave in ELITE_WAVES:
+        return 'elite', 5
+    if wave in BOSS_WAVES:
+        return 'boss', 10
+    return 'wave', 1
+
+# (wave, k) for every wave; its power is base*wave*k
+WAVE_FACTORS = [(wave, wave_kind(wave)[1]) for wave in range(1, WAVES + 1)]
+
+
+def project(bases):
+    """waves x bases matrix: row i holds the power of wave i+1 for every base."""
+    bases = list(bases)
+    # same evaluation order as the per-wave printout, so the floats match
+    return [[b * wave * k for b in bases] for wave, k in WAVE_FACTORS]
+
+
+def stage_bases(powers, levels):
+    """(stage_power, stage_level, base) for every combination."""
+    return [(p, l, p / l) for p in powers for l in levels]
+
+
+def evil_spirits(base):
+    M='M'
+    column = [row[0] for row in project([base])]
+    print(f'wave1 {base}{M}; ')
+    for wave in range(2, WAVES + 1):
+        name, k = wave_kind(wave)
+        if k>1 or wave==19:
+            print(f'{name}{wave} {base}*{wave}*{k}={column[wave-1]}{M}; ')
+
+
+def parse_values(args):
+    """Numbers, fractions like 57/3, or inclusive ranges start:stop[:step]."""
+    values = []
+    for arg in args:
+        if ':' in arg:
+            parts = [float(x) for x in arg.split(':')]
+            start, stop = parts[0], parts[1]
+            step = parts[2] if len(parts) > 2 else 1
+            if step == 0:
+                raise ValueError(f'step must not be 0: {arg}')
+            if (stop - start) * step < 0:
+                raise ValueError(f'step points away from stop: {arg}')
+            n = math.floor((stop - start) / step + 1e-9) # never past stop
+            values += [start + i * step for i in range(n + 1)]
+        elif '/' in arg:
+            num, den = arg.split('/')
+            values.append(float(num) / float(den))
+        else:
+            values.append(float(arg))
+    return values
+
+
+def write_csv(rows, matrix, out):
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(['stage_power', 'stage_level', 'base'] + [f'wave{w}' for w in range(1, WAVES + 1)])
+    for j, (power, level, base) in enumerate(rows):
+        writer.writerow([power, level, base] + [row[j] for row in matrix])
+
+
+def write_json(rows, matrix, out):
+    json.dump([{
+        'stage_power': power,
+        'stage_level': level,
+        'base': base,
+        'waves': [row[j] for row in matrix],
+    } for j, (power, level, base) in enumerate(rows)], out, indent=1)
+    out.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Evil spirits wave power projection')
+    parser.add_argument('base', nargs='*', help='base values (stage_power/stage_level), e.g. 57/3')
+    parser.add_argument('--power', nargs='+', default=[], help='stage powers, numbers or start:stop[:step]')
+    parser.add_argument('--level', nargs='+', default=[], help='stage levels, numbers or start:stop[:step]')
+    parser.add_argument('--format', choices=['text', 'csv', 'json'], default=None)
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    try:
+        rows = [(None, None, b) for b in parse_values(args.base)]
+        if args.power or args.level:
+            if not (args.power and args.level):
+                parser.error('--power and --level go together')
+            levels = parse_values(args.level)
+            if 0 in levels:
+                parser.error('--level must not be 0')
+            rows += stage_bases(parse_values(args.power), levels)
+    except (ValueError, ZeroDivisionError) as e:
+        parser.error(str(e))
+    if not rows:
+        parser.error('no base values given')
+
+    fmt = args.format or ('text' if len(rows) == 1 else 'csv')
+    if fmt == 'text':
+        for _, _, base in rows:
+            evil_spirits(base)
+        return
+
+    matrix = project(base for _, _, base in rows)
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        (write_csv if fmt == 'csv' else write_json)(rows, matrix, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
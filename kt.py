@@ -3,6 +3,15 @@ from PyQt6.QtGui import QPainter, QColor, QMouseEvent, QFont
 from PyQt6.QtCore import Qt, QRect, QSize, QThread, pyqtSignal
 import sys
 import pprint
+from array import array
+from evil_spirits import evil_spirits
+
+# '0'/'1' digits of a 0/1 cell buffer, for int(..., 2)
+_MASK_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+
+def grid_mask(cells):
+    """Occupancy bitmask of an n*n 0/1 cell buffer; bit y*n+x is cell (x, y)."""
+    return int(bytes(cells).translate(_MASK_DIGITS)[::-1], 2)
 
 # ------------------- GridInput -------------------
 class GridInput(QWidget):
@@ -13,8 +22,12 @@ class GridInput(QWidget):
         self.show_numbers = show_numbers
         self.enable_marking = enable_marking
 
-        self.grid = [[0 for _ in range(n)] for _ in range(n)]
-        self.result_overlay = [[0 for _ in range(n)] for _ in range(n)]
+        # flat row-major buffers, indexed [y, x] through the 2D views
+        self._zeros = bytes(n * n)
+        self.grid = bytearray(n * n)
+        self.result_overlay = array('b', self._zeros)
+        self.cells = memoryview(self.grid).cast('B', (n, n))
+        self.overlay = memoryview(self.result_overlay).cast('b', (n, n))
 
         self.left_button_down = False
         self._last_cell = (-1, -1)
@@ -36,7 +49,7 @@ class GridInput(QWidget):
             self._last_cell = (-1, -1)
             x, y = self._pos_to_cell(event.position())
             if 0 <= x < self.n and 0 <= y < self.n:
-                self.grid[y][x] ^= 1
+                self.cells[y, x] ^= 1
                 self._last_cell = (x, y)
                 self.clear_result_overlay()
         super().mousePressEvent(event)
@@ -45,7 +58,7 @@ class GridInput(QWidget):
         if self.enable_marking and self.left_button_down:
             x, y = self._pos_to_cell(event.position())
             if 0 <= x < self.n and 0 <= y < self.n and (x, y) != self._last_cell:
-                self.grid[y][x] ^= 1
+                self.cells[y, x] ^= 1
                 self._last_cell = (x, y)
                 self.clear_result_overlay()
         super().mouseMoveEvent(event)
@@ -57,9 +70,7 @@ class GridInput(QWidget):
         super().mouseReleaseEvent(event)
 
     def clear_result_overlay(self):
-        for y in range(self.n):
-            for x in range(self.n):
-                self.result_overlay[y][x] = 0
+        self.result_overlay[:] = array('b', self._zeros)
         self.show_probabilities = False
         self.update()
 
@@ -74,28 +85,31 @@ class GridInput(QWidget):
             for x in range(self.n):
                 rect = QRect(x*self.cell_size, y*self.cell_size, self.cell_size, self.cell_size)
                 # fill color
-                painter.fillRect(rect, QColor(50,150,255) if self.grid[y][x]==1 else QColor(240,240,240))
+                painter.fillRect(rect, QColor(50,150,255) if self.cells[y, x]==1 else QColor(240,240,240))
                 painter.setPen(Qt.GlobalColor.black)
                 painter.drawRect(rect)
 
                 if self.show_numbers and self.show_probabilities:
-                    val = self.result_overlay[y][x]
+                    val = self.overlay[y, x]
                     if val != 0:
                         if val == -1:
                             painter.setPen(QColor(128,128,128))
                             painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, "-1")
-                        elif self.grid[y][x] == 0:
+                        elif self.cells[y, x] == 0:
                             painter.setPen(QColor(255,0,0) if val==self.max_prob_value else Qt.GlobalColor.black)
                             painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, str(val))
 
     def get_states(self):
-        return [row[:] for row in self.grid]
+        """Snapshot of the grid as an n x n view, indexed [y, x]."""
+        return memoryview(bytes(self.grid)).cast('B', (self.n, self.n))
+
+    def view(self):
+        """Live zero-copy n x n view of the grid."""
+        return self.cells
 
     def clear_all(self):
-        for y in range(self.n):
-            for x in range(self.n):
-                self.grid[y][x] = 0
-                self.result_overlay[y][x] = 0
+        self.grid[:] = self._zeros
+        self.result_overlay[:] = array('b', self._zeros)
         self._last_cell = (-1, -1)
         self.show_probabilities = False
         self.update()
@@ -127,14 +141,14 @@ def all_rotations(shape):
 
 def extract_blocks_from_input(grid_states):
     n = len(grid_states)
-    visited = [[False]*n for _ in range(n)]
+    visited = bytearray(n * n)
     blocks = []
 
     for y in range(n):
         for x in range(n):
-            if grid_states[y][x]==1 and not visited[y][x]:
+            if grid_states[y, x]==1 and not visited[y*n+x]:
                 queue=[(x,y)]
-                visited[y][x]=True
+                visited[y*n+x]=1
                 cells=[]
 
                 while queue:
@@ -142,8 +156,8 @@ def extract_blocks_from_input(grid_states):
                     cells.append((cx,cy))
                     for dx,dy in [(1,0),(-1,0),(0,1),(0,-1)]:
                         nx,ny = cx+dx, cy+dy
-                        if 0<=nx<n and 0<=ny<n and grid_states[ny][nx]==1 and not visited[ny][nx]:
-                            visited[ny][nx]=True
+                        if 0<=nx<n and 0<=ny<n and grid_states[ny, nx]==1 and not visited[ny*n+nx]:
+                            visited[ny*n+nx]=1
                             queue.append((nx,ny))
 
                 min_x = min(c[0] for c in cells)
@@ -159,63 +173,55 @@ def extract_blocks_from_input(grid_states):
     pprint.pprint(blocks)
     return blocks
 
-def can_place(result_grid, shape, top, left, fixed_grid):
-    h, w = len(shape), len(shape[0])
-    if top+h>6 or left+w>6:
-        return False
-    for y in range(h):
-        for x in range(w):
-            if shape[y][x]==1 and (result_grid[top+y][left+x]==1 or fixed_grid[top+y][left+x]==1):
-                return False
-    return True
+def placement_masks(shapes, size=6):
+    """Bitmask of every position of every rotation on the size x size result grid."""
+    masks = []
+    for shape in shapes:
+        h, w = len(shape), len(shape[0])
+        cells = [(y, x) for y in range(h) for x in range(w) if shape[y][x]==1]
+        for top in range(size-h+1):
+            for left in range(size-w+1):
+                masks.append(sum(1 << ((top+y)*size + left+x) for y, x in cells))
+    return masks
 
 
 # ------------------- ComputeThread (safe abort) -------------------
 class ComputeThread(QThread):
     finished_signal = pyqtSignal(list,int)
 
-    def __init__(self, blocks, result_grid_widget):
+    def __init__(self, blocks, fixed_cells):
         super().__init__()
         self.blocks = blocks
-        self.result_grid_widget = result_grid_widget
+        self.fixed_cells = fixed_cells
         self._abort = False
 
     def abort(self):
         self._abort = True
 
     def run(self):
-        count_grid = [[0]*6 for _ in range(6)]
-        empty_grid = [[0]*6 for _ in range(6)]
-        fixed_grid = [[1 if cell==1 else 0 for cell in row] for row in self.result_grid_widget.get_states()]
-        total = self.enumerate_safe(self.blocks,0,empty_grid,count_grid,fixed_grid)
+        counts = [0]*36
+        fixed = grid_mask(self.fixed_cells)
+        block_masks = [placement_masks(shapes) for shapes in self.blocks]
+        total = self.enumerate_safe(block_masks,0,0,counts,fixed)
         if not self._abort:
+            count_grid = [counts[y*6:(y+1)*6] for y in range(6)]
             self.finished_signal.emit(count_grid,total)
 
-    def enumerate_safe(self, blocks, index, current_grid, count_grid, fixed_grid):
+    def enumerate_safe(self, block_masks, index, current, counts, fixed):
         if self._abort:
             return 0
-        if index==len(blocks):
-            for y in range(6):
-                for x in range(6):
-                    if current_grid[y][x]==1 and fixed_grid[y][x]==0:
-                        count_grid[y][x]+=1
+        if index==len(block_masks):
+            while current:
+                low = current & -current
+                counts[low.bit_length()-1] += 1
+                current ^= low
             return 1
 
         total=0
-        for shape in blocks[index]:
-            h,w = len(shape), len(shape[0])
-            for top in range(6-h+1):
-                for left in range(6-w+1):
-                    if can_place(current_grid,shape,top,left,fixed_grid):
-                        placed=[]
-                        for y in range(h):
-                            for x in range(w):
-                                if shape[y][x]==1:
-                                    current_grid[top+y][left+x]=1
-                                    placed.append((top+y,left+x))
-                        total += self.enumerate_safe(blocks,index+1,current_grid,count_grid,fixed_grid)
-                        for yy,xx in placed:
-                            current_grid[yy][xx]=0
+        occupied = current | fixed
+        for mask in block_masks[index]:
+            if not mask & occupied:
+                total += self.enumerate_safe(block_masks,index+1,current|mask,counts,fixed)
         return total
 
 
@@ -262,28 +268,30 @@ class MainUI(QMainWindow):
             self.compute_thread.abort()
             self.compute_thread.wait()
 
-        self.compute_thread = ComputeThread(blocks,self.result_grid)
+        self.compute_thread = ComputeThread(blocks,self.result_grid.view())
         self.compute_thread.finished_signal.connect(self.on_compute_finished)
         self.compute_thread.start()
         print("Started computation...")
 
     def on_compute_finished(self,count_grid,total_placements):
+        cells = self.result_grid.cells
+        overlay = self.result_grid.overlay
         if total_placements==0:
             for y in range(6):
                 for x in range(6):
-                    if self.result_grid.grid[y][x]==0:
-                        self.result_grid.result_overlay[y][x]=-1
+                    if cells[y, x]==0:
+                        overlay[y, x]=-1
         else:
             max_prob=0
             for y in range(6):
                 for x in range(6):
-                    if self.result_grid.grid[y][x]==0:
+                    if cells[y, x]==0:
                         val=round(count_grid[y][x]*100/total_placements)
-                        self.result_grid.result_overlay[y][x]=val
+                        overlay[y, x]=val
                         if val>max_prob:
                             max_prob=val
                     else:
-                        self.result_grid.result_overlay[y][x]=0
+                        overlay[y, x]=0
             self.result_grid.max_prob_value=max_prob
         self.result_grid.show_numbers=True
         self.result_grid.show_probabilities=True
@@ -300,23 +308,6 @@ class MainUI(QMainWindow):
         self.btn_compute.setEnabled(True)
         print("Reset All\n")
 
-def evil_spirits(base):
-    M='M'
-    print(f'wave1 {base}{M}; ')
-    for wave in range(2,21):
-        power=base*wave
-        if wave in [7,14,17]:
-            name='elite'
-            k=5
-        elif wave in [10,20]:
-            name='boss'
-            k=10
-        else:
-            name='wave'
-            k=1
-        if k>1 or wave==19:
-            print(f'{name}{wave} {base}*{wave}*{k}={base*wave*k}{M}; ')
-
 # ------------------- Run -------------------
 if __name__=="__main__":
     evil_spirits(base=57/3) # stage_power/stage_level 
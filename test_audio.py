@@ -0,0 +1,37 @@
+import os
+import json
+import time
+
+import pytest
+
+import audio
+
+
+def test_recording_backend_records_start_times():
+    backend = audio.RecordingBackend()
+    backend.load("a", audio.make_tone())
+    backend.load("b", b"")
+    before = time.monotonic()
+    backend.play("a")
+    backend.play("b")
+    backend.wait_idle()
+    assert [name for name, _, _ in backend.played] == ["a", "b"]
+    assert all(before <= mono <= time.monotonic() for _, mono, _ in backend.played)
+
+
+def test_recording_backend_log(tmp_path, monkeypatch):
+    log = tmp_path / "audio.jsonl"
+    monkeypatch.setenv("KG_AUDIO", "record")
+    monkeypatch.setenv("KG_AUDIO_LOG", str(log))
+    backend = audio.get_backend()
+    backend.play(audio.ALARM_SOUND)
+    backend.wait_idle()
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [r["name"] for r in records] == [audio.ALARM_SOUND]
+    assert records[0]["time"] == pytest.approx(time.time(), abs=5)
+
+
+def test_unknown_backend(monkeypatch):
+    monkeypatch.setenv("KG_AUDIO", "speaker")
+    with pytest.raises(ValueError, match="record"):
+        audio.get_backend()
@@ -0,0 +1,73 @@
+import io
+
+from dashboard import Dashboard
+
+
+class Tty(io.StringIO):
+    def isatty(self):
+        return True
+
+
+def frame(dash, lines):
+    """Set lines and render one frame synchronously; returns what was written."""
+    start = len(dash.stream.getvalue())
+    dash.set_lines(lines)
+    with dash._lock:
+        dash._flush()
+    return dash.stream.getvalue()[start:]
+
+
+def test_first_frame_draws_everything():
+    dash = Dashboard(stream=Tty())
+    assert frame(dash, ["a 00:10", "b 00:20"]) == "\ra 00:10\r\nb 00:20"
+
+
+def test_only_changed_span_is_written():
+    dash = Dashboard(stream=Tty())
+    frame(dash, ["a 00:10", "b 00:20"])
+    assert frame(dash, ["a 00:09", "b 00:20"]) == "\x1b[1A\r\x1b[5C09"
+    assert frame(dash, ["a 00:09", "b 00:20"]) == ""
+    # cursor is now after "09" on row 0; same-length change in the middle of row 1
+    assert frame(dash, ["a 00:09", "b 01:20"]) == "\x1b[1B\r\x1b[3C1"
+
+
+def test_shorter_line_clears_its_tail():
+    dash = Dashboard(stream=Tty())
+    frame(dash, ["PAUSED x"])
+    assert frame(dash, ["PAUSE"]) == "\r\x1b[5C\x1b[K"
+
+
+def test_shrinking_block_blanks_removed_rows():
+    dash = Dashboard(stream=Tty())
+    frame(dash, ["aa", "bb", "cc"])
+    assert frame(dash, ["aa"]) == "\x1b[1A\r\x1b[K\x1b[1B\x1b[K"
+    assert dash._shown == ["aa", "", ""]
+
+
+def test_log_prints_above_and_redraws_block():
+    dash = Dashboard(stream=Tty())
+    frame(dash, ["x 1", "y 2"])
+    start = len(dash.stream.getvalue())
+    dash.log("clock jumped")
+    assert dash.stream.getvalue()[start:] == "\x1b[1A\r\x1b[Jclock jumped\n"
+    assert frame(dash, ["x 1", "y 2"]) == "\rx 1\r\ny 2"
+
+
+def test_not_a_tty_prints_changed_lines():
+    dash = Dashboard(stream=io.StringIO())
+    assert not dash.ansi
+    assert frame(dash, ["a 1", "b 2"]) == "a 1\nb 2\n"
+    assert frame(dash, ["a 1", "b 3"]) == "b 3\n"
+    assert frame(dash, ["a 1", "b 3"]) == ""
+    assert "\x1b" not in dash.stream.getvalue()
+
+
+def test_render_thread_and_close():
+    stream = Tty()
+    dash = Dashboard(fps=50, stream=stream).start()
+    for i in range(5):
+        dash.set_lines([f"n {i}"])
+    dash.close()
+    out = stream.getvalue()
+    assert out.startswith("\x1b[?25l") and out.endswith("\n\x1b[?25h")
+    assert dash._shown == ["n 4"]
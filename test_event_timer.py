@@ -0,0 +1,162 @@
+import json
+import time
+import types
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import event_timer
+
+ALARMS = """
+UTC Mo 16:00 # comment
+UTC Th 10:00
+UTC+8 Sa 01:00
+12:30 # daily
+UTC-5 21:15:30
+"""
+
+
+def load():
+    return event_timer.load_alarms(ALARMS)
+
+
+def test_next_occurrences_match_compute_next_occurrences():
+    alarms = load()
+    now = datetime.now(event_timer.LOCAL_TZ)
+    expected = sorted(local for a in alarms for _, local in event_timer.compute_next_occurrences(a))
+    got = event_timer.next_occurrences(len(expected), start=now, alarms=alarms)
+    assert [local for _, _, local in got] == expected
+
+
+def test_occurrences_between_is_half_open():
+    alarms = event_timer.load_alarms("UTC Mo 16:00\nUTC Th 10:00\nUTC 12:00\n")
+    start = datetime(2026, 10, 19, 16, 0, tzinfo=timezone.utc) # UTC Mo 16:00 exactly
+    end = datetime(2026, 10, 22, 10, 0, tzinfo=timezone.utc) # UTC Th 10:00 exactly
+    got = event_timer.occurrences_between(start, end, alarms)
+    assert got[0][0]["raw"] == "UTC Mo 16:00"
+    assert got[0][2] == start
+    assert all(start <= local < end for _, _, local in got)
+    assert not any(a["raw"] == "UTC Th 10:00" for a, _, _ in got)
+    # Monday 16:00, then the daily 12:00 on Tuesday and Wednesday
+    assert [orig.day for _, orig, _ in got] == [19, 20, 21]
+
+
+def test_long_range_repeats_weekly():
+    alarms = load()
+    start = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    got = event_timer.occurrences_between(start, start + timedelta(weeks=52), alarms)
+    assert len(got) == 52 * (1 + 1 + 1 + 7 + 7)
+    locals_ = [local for _, _, local in got]
+    assert locals_ == sorted(locals_)
+    for alarm, orig, _ in got:
+        assert (orig.hour, orig.minute, orig.second) == (alarm["hour"], alarm["minute"], alarm["second"])
+        if alarm["weekday"] is not None:
+            assert orig.weekday() == alarm["weekday"]
+
+
+def test_ical_export():
+    alarms = event_timer.load_alarms("UTC Mo 16:00 # " + "long comment, with; specials " * 5)
+    occ = event_timer.occurrences_between(datetime(2026, 10, 19, tzinfo=timezone.utc),
+                                          datetime(2026, 11, 2, tzinfo=timezone.utc), alarms)
+    text = event_timer.occurrences_to_ical(occ)
+    assert text.startswith("BEGIN:VCALENDAR\r\n") and text.endswith("END:VCALENDAR\r\n")
+    lines = text.split("\r\n")[:-1]
+    assert all(len(l.encode()) <= 75 for l in lines)
+    unfolded = text.replace("\r\n ", "").split("\r\n")
+    assert unfolded.count("BEGIN:VEVENT") == 2
+    assert "DTSTART:20261019T160000Z" in unfolded
+    assert "DTSTART:20261026T160000Z" in unfolded
+    summary = next(l for l in unfolded if l.startswith("SUMMARY:"))
+    assert summary.startswith(r"SUMMARY:long comment\, with\; specials")
+
+
+def test_json_export():
+    alarms = load()
+    start = datetime(2026, 10, 19, 16, 0, tzinfo=timezone.utc)
+    occ = event_timer.next_occurrences(3, start, alarms)
+    data = json.loads(event_timer.occurrences_to_json(occ))
+    assert len(data) == 3
+    assert data[0]["alarm"] == "UTC Mo 16:00 # comment"
+    assert data[0]["comment"] == "comment"
+    assert data[0]["start_utc"] == "2026-10-19T16:00:00+00:00"
+    assert datetime.fromisoformat(data[0]["start"]) == start
+
+
+# ------------------- firing -------------------
+@pytest.fixture
+def fire_state(monkeypatch):
+    monkeypatch.setattr(event_timer, "fired_occurrences", set())
+    monkeypatch.setattr(event_timer, "fire_log", [])
+    monkeypatch.setattr(event_timer, "latency_log_path", None)
+    monkeypatch.setattr(event_timer, "ADVANCE_SECONDS_LIST", [300, 0])
+
+
+def run_fires(cursor, now_local, alarms):
+    """The alarm loop's bookkeeping with every wait already over at now_local."""
+    event_timer.alarm_list = alarms
+    fired = []
+    while True:
+        next_fire = event_timer.find_next_fire(cursor)
+        if next_fire is None or next_fire[0] > now_local:
+            return fired
+        event_timer.register_fire(next_fire, now_local)
+        fired.append(next_fire)
+        cursor = next_fire[0]
+
+
+def test_each_occurrence_fires_once_after_suspend(fire_state):
+    alarms = event_timer.load_alarms("UTC 10:00\nUTC 10:30\n")
+    suspended = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+    resumed = datetime(2026, 10, 20, 11, 0, tzinfo=timezone.utc)
+    fired = run_fires(suspended, resumed, alarms)
+    occurrences = [(f[1]["raw"], f[2]) for f in fired]
+    assert len(occurrences) == len(set(occurrences)) == 4 # two alarms on two days
+    # one fire per occurrence: at its earliest due time, the advance warning
+    assert all(f[5] == 300 for f in fired)
+    lates = [e["latency_ms"] for e in event_timer.fire_log]
+    assert lates == sorted(lates, reverse=True) and min(lates) > 0
+    # nothing left to fire until tomorrow's warnings
+    assert event_timer.find_next_fire(fired[-1][0])[0] == datetime(2026, 10, 21, 9, 55, tzinfo=timezone.utc)
+
+
+def test_fired_alarm_is_not_found_again_when_wall_clock_lags(fire_state):
+    event_timer.alarm_list = event_timer.load_alarms("UTC 10:00\n")
+    cursor = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+    first = event_timer.find_next_fire(cursor)
+    event_timer.register_fire(first, first[0] - timedelta(milliseconds=3))
+    second = event_timer.find_next_fire(first[0])
+    assert (second[2], second[4]) != (first[2], first[4])
+    assert second[0] == first[3] # the on-time alarm is still due
+
+
+def test_prune_fired_drops_old_keys(fire_state):
+    now = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+    old = (1, now - timedelta(seconds=301), 0)
+    recent = (1, now - timedelta(seconds=299), 0)
+    event_timer.fired_occurrences.update([old, recent])
+    event_timer.prune_fired(now)
+    assert event_timer.fired_occurrences == {recent}
+
+
+def test_wait_until_resyncs_after_clock_jump(monkeypatch):
+    calls = []
+    def fake_time():
+        calls.append(1)
+        return time.time() + (200 if len(calls) > 1 else 0) # suspended 200 s after the first read
+    monkeypatch.setattr(event_timer, "time", types.SimpleNamespace(
+        time=fake_time, monotonic=time.monotonic, sleep=time.sleep))
+    monkeypatch.setattr(event_timer, "CLOCK_CHECK_SECONDS", 0.01)
+    monkeypatch.setattr(event_timer.dashboard, "log", lambda text: None)
+    start = time.monotonic()
+    assert event_timer.wait_until(datetime.now(event_timer.LOCAL_TZ) + timedelta(seconds=100))
+    assert time.monotonic() - start < 1
+
+
+def test_latency_histogram_and_report():
+    entries = [{"latency_ms": v} for v in (0.5, 1, 3, 99, 100.5, -2, 20000)]
+    hist = dict(event_timer.latency_histogram(entries))
+    assert hist == {1: 2, 5: 2, 10: 0, 50: 0, 100: 1, 500: 1, 1000: 0, 10000: 0, None: 1}
+    report = event_timer.latency_report(entries)
+    assert report.startswith("fires 7")
+    assert "<100ms 71.4%" in report
+    assert event_timer.latency_report([]) == "no alarms fired"
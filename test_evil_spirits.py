@@ -0,0 +1,32 @@
+import pytest
+
+import evil_spirits
+
+
+def test_parse_values_ranges_stop_inclusive_never_past():
+    assert evil_spirits.parse_values(['1:5:2.5']) == [1.0, 3.5]
+    assert evil_spirits.parse_values(['1:3']) == [1.0, 2.0, 3.0]
+    assert evil_spirits.parse_values(['5:1:-2']) == [5.0, 3.0, 1.0]
+    assert evil_spirits.parse_values(['0:1:0.1'])[-1] == pytest.approx(1.0)
+    assert evil_spirits.parse_values(['57/3', '2']) == [19.0, 2.0]
+
+
+@pytest.mark.parametrize('args', [
+    ['--power', '100:50:5', '--level', '1'],
+    ['--power', '1:2:0', '--level', '1'],
+    ['--power', '1', '--level', '0'],
+    ['1/0'],
+])
+def test_bad_values_are_usage_errors(args, capsys):
+    with pytest.raises(SystemExit) as exc:
+        evil_spirits.main(args)
+    assert exc.value.code == 2
+    assert 'error:' in capsys.readouterr().err
+
+
+def test_project_matches_printout(capsys):
+    evil_spirits.evil_spirits(33.3)
+    printed = capsys.readouterr().out
+    column = [row[0] for row in evil_spirits.project([33.3])]
+    assert f'boss10 33.3*10*10={column[9]}M; ' in printed
+    assert column[9] == 33.3 * 10 * 10
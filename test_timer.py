@@ -0,0 +1,114 @@
+import time
+import random
+import threading
+
+import pytest
+
+import audio
+import timer
+
+
+def test_alarm_plays_through_injected_backend(monkeypatch):
+    backend = audio.get_backend("record")
+    monkeypatch.setattr(timer, "audio", backend)
+    monkeypatch.setattr(timer, "stop_all", False)
+    manager = timer.TimerManager(on_fire=timer.on_timer_fire)
+    manager.add("boss", 0.1)
+    manager.start()
+    thread = threading.Thread(target=timer.alarm_sound_thread_func, daemon=True)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 3
+        while not backend.played and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        manager.stop()
+        timer.stop_all = True
+        timer.alarm_sound_active.set() # wake the thread so it sees stop_all
+        thread.join(2)
+        timer.alarm_sound_active.clear()
+        timer.alarm_active.clear()
+    assert not thread.is_alive()
+    assert backend.played[0][0] == audio.ALARM_SOUND
+
+
+# ------------------- TimerManager -------------------
+def start_manager():
+    fires = []
+    manager = timer.TimerManager(on_fire=lambda name: fires.append((name, time.monotonic())))
+    manager.start()
+    return manager, fires
+
+
+def wait_for(fires, count, timeout=5):
+    deadline = time.monotonic() + timeout
+    while len(fires) < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_pause_resume_keeps_fractional_time():
+    manager, fires = start_manager()
+    try:
+        t0 = time.monotonic()
+        manager.add("a", 0.3)
+        time.sleep(0.1)
+        manager.pause("a")
+        left = manager.timers["a"].remaining()
+        time.sleep(0.3)
+        assert manager.timers["a"].remaining() == left
+        manager.resume("a")
+        wait_for(fires, 1)
+        assert fires[0][1] - t0 == pytest.approx(0.6, abs=0.05)
+    finally:
+        manager.stop()
+
+
+def test_restart_and_restart_after_fire():
+    manager, fires = start_manager()
+    try:
+        t0 = time.monotonic()
+        manager.add("a", 0.3)
+        time.sleep(0.2)
+        manager.restart("a")
+        wait_for(fires, 1)
+        assert fires[0][1] - t0 == pytest.approx(0.5, abs=0.05)
+        assert manager.fired() == ["a"]
+        manager.restart("a")
+        assert manager.fired() == []
+        wait_for(fires, 2)
+        assert fires[1][1] - fires[0][1] == pytest.approx(0.3, abs=0.05)
+    finally:
+        manager.stop()
+
+
+def test_reused_name_does_not_fire_at_old_deadline():
+    manager, fires = start_manager()
+    try:
+        t0 = time.monotonic()
+        manager.add("a", 0.2)
+        manager.remove("a")
+        manager.add("a", 0.5)
+        wait_for(fires, 1)
+        time.sleep(0.1)
+        assert len(fires) == 1
+        assert fires[0][1] - t0 == pytest.approx(0.5, abs=0.05)
+    finally:
+        manager.stop()
+
+
+def test_many_timers_fire_in_deadline_order():
+    manager, fires = start_manager()
+    try:
+        order = list(range(40))
+        random.Random(1).shuffle(order)
+        t0 = time.monotonic()
+        for i in order:
+            manager.add(f"t{i}", 0.1 + i * 0.01)
+        manager.pause("t5")
+        wait_for(fires, 39)
+        assert [name for name, _ in fires] == [f"t{i}" for i in range(40) if i != 5]
+        for name, at in fires:
+            assert at - t0 == pytest.approx(0.1 + int(name[1:]) * 0.01, abs=0.05)
+        assert [s for _, _, s in manager.snapshot()].count("paused") == 1
+    finally:
+        manager.stop()
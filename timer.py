@@ -1,27 +1,28 @@
 import sys
 import re
-import winsound
 import threading
 import signal
-import msvcrt
 import time
+import math
+import heapq
+import itertools
 from queue import Queue
+from dashboard import Dashboard, getch
+from audio import get_backend, ALARM_SOUND
 
 stop_all = False
 
-paused = threading.Event()
-countdown_active = threading.Event()
 alarm_active = threading.Event()
 alarm_sound_active = threading.Event()
 key_event = threading.Event()
 
-total_seconds = 0
-remaining_seconds = 0
-last_time = None
-
 key_queue = Queue()
 
-last_display = ""
+dashboard = Dashboard()
+audio = None
+
+manager = None
+selected = 0
 
 
 def parse_time(time_str):
@@ -31,139 +32,301 @@ def parse_time(time_str):
         return int(d['h'] or 0) * 3600 + int(d['m'] or 0) * 60 + float(d['s'])
     raise ValueError("Time format: H:M:S, M:S, or S")
 
-def display(text='', end='\r'):
-    global last_display
-    if text != last_display:
-        print(text + " " * (len(last_display) - len(text)), end=end, flush=True)
-        last_display = text
-
 def format_hhmmss(seconds):
     seconds = int(seconds)
     mins, secs = divmod(seconds, 60)
     hours, mins = divmod(mins, 60)
     return f"{hours:02d}:{mins:02d}:{secs:02d}"
 
-def countdown_thread_func():
-    global remaining_seconds, stop_all, last_time
-    while not stop_all:
-        countdown_active.wait()
-        last_time = time.monotonic()
-        while countdown_active.is_set() and not stop_all:
-            if paused.is_set():
-                display("PAUSED")
-                time.sleep(0.1)
-                continue
-
-            now = time.monotonic()
-            elapsed = now - last_time
-            if elapsed >= 1.0:
-                remaining_seconds -= int(elapsed)
-                last_time += int(elapsed)
-
-            if remaining_seconds <= 0:
-                remaining_seconds = 0
-                countdown_active.clear()
-                alarm_active.set()
-                alarm_sound_active.set()
+class Countdown:
+    def __init__(self, name, seconds):
+        self.name = name
+        self.total = seconds
+        self.deadline = None # time.monotonic() deadline while running
+        self.left = seconds # remaining seconds while paused
+        self.fired = False
+        self.gen = 0 # new value from the manager on every reschedule, stale heap entries are skipped
+
+    @property
+    def running(self):
+        return self.deadline is not None
+
+    def remaining(self, now=None):
+        if self.deadline is None:
+            return self.left
+        return max(0.0, self.deadline - (time.monotonic() if now is None else now))
+
+
+class TimerManager:
+    """Named countdowns kept in one deadline heap and served by a single scheduler thread.
+
+    Remaining time is always derived from an absolute monotonic deadline, so
+    pause/resume/restart never accumulate rounding drift. The thread sleeps
+    until the next deadline (or the next whole-second display change when
+    on_tick is set) and not at all while every timer is paused.
+    """
+    def __init__(self, on_fire=None, on_tick=None, min_tick=0.1):
+        self.timers = {}
+        self.on_fire = on_fire
+        self.on_tick = on_tick
+        self.min_tick = min_tick
+        self._heap = []
+        self._gen = itertools.count(1) # manager-wide, so a reused name never matches an old entry
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def _reschedule(self, timer):
+        timer.gen = next(self._gen)
+        if timer.deadline is not None:
+            heapq.heappush(self._heap, (timer.deadline, timer.gen, timer.name))
+        self._cond.notify()
+
+    def add(self, name, seconds, start=True):
+        with self._cond:
+            timer = Countdown(name, seconds)
+            self.timers[name] = timer
+            if start:
+                timer.deadline = time.monotonic() + seconds
+            self._reschedule(timer)
+            return timer
+
+    def remove(self, name):
+        with self._cond:
+            timer = self.timers.pop(name, None)
+            if timer:
+                timer.gen = next(self._gen)
+                self._cond.notify()
+
+    def pause(self, name):
+        with self._cond:
+            timer = self.timers[name]
+            if timer.running:
+                timer.left = timer.remaining()
+                timer.deadline = None
+                self._reschedule(timer)
+
+    def resume(self, name):
+        with self._cond:
+            timer = self.timers[name]
+            if not timer.running and not timer.fired:
+                timer.deadline = time.monotonic() + timer.left
+                self._reschedule(timer)
+
+    def toggle(self, name):
+        with self._cond:
+            if self.timers[name].running:
+                self.pause(name)
+            else:
+                self.resume(name)
+
+    def restart(self, name):
+        with self._cond:
+            timer = self.timers[name]
+            timer.fired = False
+            timer.left = timer.total
+            timer.deadline = time.monotonic() + timer.total
+            self._reschedule(timer)
+
+    def fired(self):
+        with self._cond:
+            return [t.name for t in self.timers.values() if t.fired]
+
+    def snapshot(self):
+        """[(name, remaining_seconds, state)] in insertion order; state is running/paused/fired."""
+        now = time.monotonic()
+        with self._cond:
+            return [(t.name, t.remaining(now), "fired" if t.fired else "running" if t.running else "paused")
+                    for t in self.timers.values()]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _next_wakeup(self, now):
+        while self._heap:
+            deadline, gen, name = self._heap[0]
+            timer = self.timers.get(name)
+            if timer is not None and timer.gen == gen:
                 break
-
-            display(format_hhmmss(remaining_seconds))
-            time.sleep(0.05)
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        wakeup = self._heap[0][0]
+        if self.on_tick:
+            # next moment a displayed (whole second) value changes, but no more
+            # often than min_tick however many timers run out of phase
+            tick = min(now + ((t.deadline - now) % 1.0 or 1.0) for t in self.timers.values() if t.running)
+            wakeup = min(wakeup, max(tick, now + self.min_tick))
+        return wakeup
+
+    def run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                now = time.monotonic()
+                fired = []
+                while self._heap and self._heap[0][0] <= now:
+                    deadline, gen, name = heapq.heappop(self._heap)
+                    timer = self.timers.get(name)
+                    if timer is None or timer.gen != gen:
+                        continue
+                    timer.deadline = None
+                    timer.left = 0.0
+                    timer.fired = True
+                    fired.append(timer.name)
+                wakeup = self._next_wakeup(now)
+            for name in fired:
+                if self.on_fire:
+                    self.on_fire(name)
+            if self.on_tick:
+                self.on_tick(self.snapshot())
+            with self._cond:
+                if self._stopped:
+                    return
+                timeout = None if wakeup is None else max(0.0, wakeup - time.monotonic())
+                self._cond.wait(timeout)
+
+
+def render_timers(snapshot):
+    if len(snapshot) == 1:
+        name, remaining, state = snapshot[0]
+        return [{"paused": "PAUSED", "fired": "Alarm."}.get(state) or format_hhmmss(math.ceil(remaining))]
+    lines = []
+    for i, (name, remaining, state) in enumerate(snapshot):
+        mark = "*" if i == selected else " "
+        value = {"paused": "PAUSED", "fired": "ALARM"}.get(state) or format_hhmmss(math.ceil(remaining))
+        lines.append(f"{mark}{i+1} {value} {name}")
+    return lines
+
+
+def on_timer_tick(snapshot):
+    dashboard.set_lines(render_timers(snapshot))
+
+
+def on_timer_fire(name):
+    alarm_active.set()
+    alarm_sound_active.set()
 
 
 def alarm_sound_thread_func():
     while not stop_all:
         alarm_sound_active.wait()
-        display("Alarm.")
         while alarm_sound_active.is_set() and not stop_all:
-            winsound.PlaySound("SystemNotification", winsound.SND_ALIAS)
+            audio.play(ALARM_SOUND)
             time.sleep(0.8)
-        winsound.PlaySound(None, winsound.SND_PURGE)
+        audio.stop()
 
 
 def keyboard_thread_func():
     while not stop_all:
-        key = msvcrt.getch()
+        key = getch()
+        if not key:
+            return
         # print(f"DEBUG: key pressed: {key}")
         key_queue.put(key)
         key_event.set()
 
 
 def process_keys():
-    global stop_all, remaining_seconds, last_time
+    global stop_all, selected
+    names = list(manager.timers)
     while not key_queue.empty():
         key = key_queue.get().lower()
         if key == b'q' or key == b'\x03': # Q Ctrl+C
             stop_all = True
-            countdown_active.clear()
+            manager.stop()
             alarm_active.clear()
             alarm_sound_active.clear()
-        elif countdown_active.is_set():
-            if key == b' ':
-                if paused.is_set():
-                    paused.clear()
-                    last_time = time.monotonic()
-                else:
-                    paused.set()
-            elif key == b'r':
-                remaining_seconds = total_seconds
-                paused.clear()
-                last_time = time.monotonic()
         elif alarm_active.is_set():
-            remaining_seconds = total_seconds
-            last_time = time.monotonic()
-            countdown_active.set()
-            paused.clear()
+            for name in manager.fired():
+                manager.restart(name)
             alarm_active.clear()
             alarm_sound_active.clear()
+        elif key.isdigit() and 0 < int(key) <= len(names):
+            selected = int(key) - 1
+        elif key == b' ':
+            manager.toggle(names[selected])
+        elif key == b'r':
+            manager.restart(names[selected])
+        on_timer_tick(manager.snapshot())
 
 
 def signal_handler(sig, frame):
     global stop_all
     stop_all = True
-    countdown_active.clear()
+    if manager:
+        manager.stop()
     alarm_active.clear()
     alarm_sound_active.clear()
-    winsound.PlaySound(None, winsound.SND_PURGE)
-    display('Abort.', end='\n')
+    if audio:
+        audio.stop()
+    dashboard.close()
+    print('Abort.')
     sys.exit(0)
 
 
-signal.signal(signal.SIGINT, signal_handler)
+def parse_timer_arg(i, arg):
+    name, sep, time_str = arg.rpartition("=")
+    return (name if sep else str(i + 1)), parse_time(time_str)
 
 
 def main():
-    global stop_all, total_seconds, remaining_seconds
+    global manager, audio
+
+    signal.signal(signal.SIGINT, signal_handler)
 
-    if len(sys.argv) != 2:
-        print("Usage: python timer.py <time>")
+    if len(sys.argv) < 2:
+        print("Usage: python timer.py <time> | [name=]<time> ...")
         return
 
     try:
-        total_seconds = parse_time(sys.argv[1])
+        timers = [parse_timer_arg(i, arg) for i, arg in enumerate(sys.argv[1:])]
     except ValueError as e:
         print(f"Error: {e}")
         return
 
-    remaining_seconds = total_seconds
+    names = [name for name, _ in timers]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        print(f"Error: duplicate timer name: {', '.join(duplicates)}")
+        return
 
-    print("[Space: pause/resume] [R: restart] [Q: quit]")
-    print(f"Countdown: {format_hhmmss(total_seconds)} = {int(total_seconds)}s")
+    if len(timers) == 1:
+        print("[Space: pause/resume] [R: restart] [Q: quit]")
+    else:
+        print("[1-9: select] [Space: pause/resume] [R: restart] [Q: quit]")
+    for name, seconds in timers:
+        print(f"Countdown {name}: {format_hhmmss(seconds)} = {int(seconds)}s")
+
+    try:
+        audio = audio or get_backend() # tests may assign a backend before main()
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    dashboard.start()
+    manager = TimerManager(on_fire=on_timer_fire, on_tick=on_timer_tick)
+    for name, seconds in timers:
+        manager.add(name, seconds)
+    manager.start()
 
-    threading.Thread(target=countdown_thread_func, daemon=True).start()
     threading.Thread(target=alarm_sound_thread_func, daemon=True).start()
     threading.Thread(target=keyboard_thread_func, daemon=True).start()
 
-    countdown_active.set()
-    paused.clear()
-
     while not stop_all:
         key_event.wait()
         key_event.clear()
         process_keys()
         time.sleep(0.01)
 
-    display('Exit.', end='\n')
+    dashboard.close()
+    print('Exit.')
 
 
 if __name__ == "__main__":